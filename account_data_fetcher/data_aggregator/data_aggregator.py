@@ -11,6 +11,7 @@ from setproctitle import setproctitle
 import zmq
 
 from infrastructure.log_handler import fetch_logging_config
+from infrastructure.message_codec import decode_message
 
 @dataclass
 class Subscription:
@@ -275,6 +276,7 @@ class DataAggregator:
         connected subscriber (SUB).
         - This method assumes that each message received from a subscriber contains both 
         balance and position data, identified by an "exchange" field.
+        - Fetcher messages are [topic, wire format, payload] frames, see infrastructure.message_codec.
         """
         context = zmq.Context()
 
@@ -296,8 +298,8 @@ class DataAggregator:
         #TODO: Handle failure. What if an exchange stop publishing and we just loop forever? Need some form of heartbit logic.
         #TODO: Make the function more modular, the data_aggregator should be agnostic to what data is being aggregated as that should be abstracted away.
         while True:
-            _, data = sub_socket.recv_multipart()
-            balance_and_positions_dict = json.loads(data.decode())
+            _, wire_format, data = sub_socket.recv_multipart()
+            balance_and_positions_dict = decode_message(data, wire_format)
             exchange_name = balance_and_positions_dict.pop("exchange")
 
             self.logger.debug(f"Received {exchange_name=}, {data=}")
@@ -14,6 +14,8 @@ from binance.spot import Spot
 from account_data_fetcher.exchanges.exchange_base import ExchangeBase
 from infrastructure.api_secret_getter import ApiMetaData
 
+_USD_STABLE_TICKERS = frozenset({"BUSD", "USDC", "USDT"})
+
 
 class DataFetcher(ExchangeBase):
     _EXCHANGE = "Binance"
@@ -184,7 +186,7 @@ class DataFetcher(ExchangeBase):
             btc_amount = float(asset_information["btcValuation"])
             asset_amount = float(asset_information["free"])
             if  btc_amount > 0.1 or asset_amount > 100:
-                if asset_information['asset'] in ["BUSD", "USDC", "USDT"]:
+                if asset_information['asset'] in _USD_STABLE_TICKERS:
                     netliq_in_dollars += asset_amount
                     continue
                 elif "NFT" in asset_information['asset']:
@@ -198,12 +200,12 @@ class DataFetcher(ExchangeBase):
         netliq_in_dollars = 0
         for cross in binance_balances_isolated_margin["assets"]:
             if str(cross["baseAsset"]["netAsset"]) != "0" and str(cross["quoteAsset"]["netAsset"]) != "0":
-                if cross['baseAsset']["asset"] in ["BUSD", "USDC", "USDT"]:
+                if cross['baseAsset']["asset"] in _USD_STABLE_TICKERS:
                     netliq_in_dollars += float(cross['baseAsset']['netAsset'])
                 else:
                     price = float(self.get_latest_price(cross['baseAsset']["asset"]+"USDC")["price"])
                     netliq_in_dollars += price * float(cross['baseAsset']['netAsset'])
-                if cross['quoteAsset']["asset"] in ["BUSD", "USDC", "USDT"]:
+                if cross['quoteAsset']["asset"] in _USD_STABLE_TICKERS:
                     netliq_in_dollars += float(cross['quoteAsset']['netAsset'])
                 else:
                     price = float(self.get_latest_price(cross['quoteAsset']["asset"]+"USDC")["price"])
@@ -264,7 +266,7 @@ class DataFetcher(ExchangeBase):
                 data_to_return["Symbol"].append(user_asset['asset'])
                 data_to_return["Multiplier"].append(int(1))
                 data_to_return["Quantity"].append(float(user_asset["free"])+ float(user_asset["locked"]) + float(user_asset["freeze"]) + float(user_asset["withdrawing"]))
-                dollar_quantity = data_to_return["Quantity"][-1] if user_asset['asset'] in ["BUSD", "USDC", "USDT"] else round(float(self.get_latest_price(user_asset["asset"]+"USDT")["price"]) * data_to_return["Quantity"][-1],3)
+                dollar_quantity = data_to_return["Quantity"][-1] if user_asset['asset'] in _USD_STABLE_TICKERS else round(float(self.get_latest_price(user_asset["asset"]+"USDT")["price"]) * data_to_return["Quantity"][-1],3)
                 data_to_return["Dollar Quantity"].append(round(dollar_quantity),3)
         
         return data_to_return
@@ -285,8 +287,8 @@ class DataFetcher(ExchangeBase):
                 data_to_return["Symbol"] += [user_asset["baseAsset"]['asset'], user_asset["quoteAsset"]['asset']]
                 data_to_return["Multiplier"] += [1, 1]
                 data_to_return["Quantity"] += [user_asset["baseAsset"]['netAsset'], user_asset["quoteAsset"]['netAsset']]
-                dollar_quantity_base = float(user_asset["baseAsset"]['netAsset']) if user_asset["baseAsset"]['asset'] in ["BUSD", "USDC", "USDT"] else round(float(self.get_latest_price(user_asset['baseAsset']["asset"]+"USDC")["price"]) * float(user_asset["baseAsset"]['netAsset']),3)
-                dollar_quantity_quote = float(user_asset["quoteAsset"]['netAsset']) if user_asset["quoteAsset"]['asset'] in ["BUSD", "USDC", "USDT"] else round(float(self.get_latest_price(user_asset['quoteAsset']["asset"]+"USDC")["price"]) * float(user_asset["quoteAsset"]['netAsset']),3)
+                dollar_quantity_base = float(user_asset["baseAsset"]['netAsset']) if user_asset["baseAsset"]['asset'] in _USD_STABLE_TICKERS else round(float(self.get_latest_price(user_asset['baseAsset']["asset"]+"USDC")["price"]) * float(user_asset["baseAsset"]['netAsset']),3)
+                dollar_quantity_quote = float(user_asset["quoteAsset"]['netAsset']) if user_asset["quoteAsset"]['asset'] in _USD_STABLE_TICKERS else round(float(self.get_latest_price(user_asset['quoteAsset']["asset"]+"USDC")["price"]) * float(user_asset["quoteAsset"]['netAsset']),3)
                 data_to_return["Dollar Quantity"].append([dollar_quantity_base, dollar_quantity_quote])
 
         return data_to_return
@@ -8,6 +8,9 @@ from account_data_fetcher.exchanges.bybit.exception import FailedRequestError, I
 from account_data_fetcher.exchanges.exchange_base import ExchangeBase
 from infrastructure.api_secret_getter import ApiMetaData
 
+_USD_STABLE_TICKERS = frozenset({"BUSD", "USDC", "USDT"})
+_USD_STABLE_TICKERS_WITH_DAI = _USD_STABLE_TICKERS | {"DAI"}
+
 #TODO make a config object to be parsed so that we can modify which account type to fetch
 class DataFetcher(ExchangeBase):
     _EXCHANGE = "BYBIT"
@@ -50,7 +53,7 @@ class DataFetcher(ExchangeBase):
                     
                 name = balance["coin"]
                 
-                if name.upper() in ["BUSD", "USDC", "USDT"]:
+                if name.upper() in _USD_STABLE_TICKERS:
                     spot_netliq += coin_balance
                 else:
                     spot_netliq += coin_balance * self.__get_coin_price(name)
@@ -129,7 +132,7 @@ class DataFetcher(ExchangeBase):
 
         for position in positions:
             quantity = round(float(position["walletBalance"]),3)
-            dollar_quantity = quantity if position["coin"].upper() in ["BUSD", "USDC", "USDT"] else \
+            dollar_quantity = quantity if position["coin"].upper() in _USD_STABLE_TICKERS else \
                               quantity * self.__get_coin_price(position["coin"])
             if dollar_quantity > 100:
                 data_to_return["Symbol"].append(position["coin"])
@@ -153,7 +156,7 @@ class DataFetcher(ExchangeBase):
             quantity = round(float(position["walletBalance"]),3)
             dollar_quantity = 0
             if quantity > 0:
-                dollar_quantity = 0 if position["coin"].upper() in ["BUSD", "USDC", "USDT", "DAI"] else \
+                dollar_quantity = 0 if position["coin"].upper() in _USD_STABLE_TICKERS_WITH_DAI else \
                                 quantity * self.__get_coin_price(position["coin"])
             if dollar_quantity > 100:
                 data_to_return["Symbol"].append(position["coin"])
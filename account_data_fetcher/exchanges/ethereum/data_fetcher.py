@@ -1,8 +1,9 @@
 import dataclasses
-from datetime import datetime, timedelta
 import json
 import logging
+import math
 import os
+from time import monotonic
 from typing import Callable, Dict, List, Optional
 
 from web3 import Web3
@@ -14,30 +15,21 @@ from infrastructure.api_secret_getter import ApiMetaData
 
 @dataclasses.dataclass(init=True, eq=True, repr=True)
 class balanceMetaData:
-    timestamp: datetime
+    timestamp: float
     balance_per_coin: Dict[str, float]
 
-    def is_acceptable_timestamp_detla(self, delta_in_seconds_allowed) -> bool:
-
-            dt = datetime.utcnow()
-
-            delta: timedelta = dt - self.timestamp
-
-            return delta.total_seconds() < delta_in_seconds_allowed
+    def is_acceptable_timestamp_delta(self, delta_in_seconds_allowed) -> bool:
+        # timestamp is a time.monotonic() reading, immune to wall clock adjustments
+        return monotonic() - self.timestamp < delta_in_seconds_allowed
 
 
 @dataclasses.dataclass(init=True, eq=True, repr=True)
 class priceMetaData:
-    timestamp: datetime
+    timestamp: float
     prices_per_coin: Dict[str, Dict[str, float]]
 
-    def is_acceptable_timestamp_detla(self, delta_in_seconds_allowed) -> bool:
-
-            dt = datetime.utcnow()
-
-            delta: timedelta = dt - self.timestamp 
-                
-            return delta.total_seconds() < delta_in_seconds_allowed
+    def is_acceptable_timestamp_delta(self, delta_in_seconds_allowed) -> bool:
+        return monotonic() - self.timestamp < delta_in_seconds_allowed
 
 #TODO: Batch calls via multicall contracts + use helios lightweight client (need to fix eth_call loops, broken atm)
 class DataFetcher(ExchangeBase):
@@ -52,7 +44,11 @@ class DataFetcher(ExchangeBase):
         self.__ADDRESS_BY_COIN, self.__DECIMAL_BY_COIN = self.__get_coin_configs()
         self.w3 = Web3(Web3.HTTPProvider(self.__URL+secrets.key))
         self.contract_by_coin: dict = self.__get_contract_by_coin()
+        # usd denominated coins, classified once rather than substring-scanned on every pass
+        self.usd_coins: frozenset = frozenset(coin for coin in self.__ADDRESS_BY_COIN if "USD" in coin)
         self.address_of_interest: list = self.__get_address_of_interest()
+        self.multicall_contract = self.w3.eth.contract(address=MULTICALL_3_ADDRESS, abi=MULTICALL3_ABI)
+        self.multi_calls: tuple = self.__get_multi_calls()
         self.delta_in_seconds_allowed: int = delta_in_seconds_allowed
         self.price_fetcher: CoingeckoDataFetcher = CoingeckoDataFetcher()
     
@@ -89,78 +85,71 @@ class DataFetcher(ExchangeBase):
         current_directory = os.path.dirname(__file__)
         path = os.path.abspath(os.path.join(current_directory, '..', '..', 'config', 'onchain_meta_data.json'))
 
+        # checksummed once here, rather than hashing every address on each balance query
         with open(path, "r") as f:
-            return json.load(f)['addresses_per_chain']['Ethereum']
+            return [Web3.to_checksum_address(address) for address in json.load(f)['addresses_per_chain']['Ethereum']]
             
     def __get_total_balance_by_coin(self, delta_in_seconds: int = 120) -> float:
         if self.balance_meta_data:
-            if self.balance_meta_data.is_acceptable_timestamp_detla(delta_in_seconds):
+            if self.balance_meta_data.is_acceptable_timestamp_delta(delta_in_seconds):
                 return self.balance_meta_data.balance_per_coin
 
-        eth_balance_gwei: float = self.__get_eth_balances()
-
         token_balances: dict[str, float] = self.__get_token_balances_by_coin()
 
-        token_balances["ETH"] = eth_balance_gwei
-
         self.balance_meta_data = balanceMetaData(
-            timestamp=datetime.utcnow(),
+            timestamp=monotonic(),
             balance_per_coin=token_balances
         )
 
         return token_balances
 
-    def __get_eth_balances(self) -> dict:
-        balance: float = 0
-        
-        for my_address in self.address_of_interest:
-            balance +=  self.w3.eth.get_balance(Web3.to_checksum_address(my_address)) / (10 ** self.__DECIMAL_BY_COIN["ETH"])
-
-        return balance
-    
     def __get_token_balances_by_coin(self) -> dict:
         balance_by_coin: dict[str, float] = {}
 
         multi_call_result = self.__query_multi_call()
 
-        counter: int = 0
-        for coin, _ in self.__ADDRESS_BY_COIN.items():
-            for _ in self.address_of_interest:
-               balance = self.w3.to_int(multi_call_result[counter])
-               if coin in balance_by_coin and int(balance) > 0:
-                   balance_by_coin[coin] += balance / 10 ** self.__DECIMAL_BY_COIN[coin.upper()]
-               elif coin not in balance_by_coin and int(balance) > 0:
-                   balance_by_coin[coin] = balance / 10 ** self.__DECIMAL_BY_COIN[coin.upper()]
-               counter += 1
+        # ether balances come first, one per address; wei stays integral until the per-coin total is scaled
+        results = iter(multi_call_result)
+        balance_by_coin["ETH"] = sum(self.w3.to_int(next(results)) for _ in self.address_of_interest) / 10 ** self.__DECIMAL_BY_COIN["ETH"]
+
+        for coin in self.__ADDRESS_BY_COIN:
+            wei_balance: int = sum(self.w3.to_int(next(results)) for _ in self.address_of_interest)
+            if wei_balance > 0:
+                balance_by_coin[coin] = wei_balance / 10 ** self.__DECIMAL_BY_COIN[coin.upper()]
 
         return balance_by_coin
     
-    def __query_multi_call(self) -> List[bytes]:
+    def __get_multi_calls(self) -> tuple:
+        """
+        Encodes every ether balance (Multicall3.getEthBalance) then every token balanceOf read, once per process.
+        """
         calls: List[tuple] = []
+
+        for address in self.address_of_interest:
+            calls.append((MULTICALL_3_ADDRESS, self.multicall_contract.encodeABI(fn_name="getEthBalance", args=[address])))
         
         for coin, token_address in self.__ADDRESS_BY_COIN.items():
             for address in self.address_of_interest:
-                balance_call_data = self.contract_by_coin[coin].encodeABI(fn_name='balanceOf', args=[Web3.to_checksum_address(address)])  
+                balance_call_data = self.contract_by_coin[coin].encodeABI(fn_name='balanceOf', args=[address])  
                 calls.append((token_address, balance_call_data))
-                
-        multicall_contract = self.w3.eth.contract(address=MULTICALL_3_ADDRESS, abi=MULTICALL3_ABI)
-        return multicall_contract.functions.aggregate(tuple(calls)).call()[1]
+
+        return tuple(calls)
+
+    def __query_multi_call(self) -> List[bytes]:
+        return self.multicall_contract.functions.aggregate(self.multi_calls).call()[1]
 
     def fetch_balance(self, accountType = "SPOT") -> float:
         balance_by_coin: dict = self.__get_total_balance_by_coin()
         self.logger.debug(f"{balance_by_coin=}")
         
-        netliq: float = 0
-        
         self.get_prices_for_coins(balance_by_coin)
-        
-        for coin, balance in balance_by_coin.items():
-            if "USD" in coin:
-                netliq += balance
-            else:
-                price = self.price_meta_data.prices_per_coin[coin]["usd"]
-                netliq += float(balance) * float(price)
-        
+        prices_per_coin = self.price_meta_data.prices_per_coin
+
+        netliq: float = math.fsum(
+            balance if coin in self.usd_coins else float(balance) * float(prices_per_coin[coin]["usd"])
+            for coin, balance in balance_by_coin.items()
+        )
+
         return round(netliq,3)
     
     def fetch_positions(self) -> dict:
@@ -176,38 +165,47 @@ class DataFetcher(ExchangeBase):
 
         self.get_prices_for_coins(balance_by_coin) 
 
+        # bound once, rather than four dict lookups per coin
+        append_symbol = data_to_return["Symbol"].append
+        append_multiplier = data_to_return["Multiplier"].append
+        append_quantity = data_to_return["Quantity"].append
+        append_dollar_quantity = data_to_return["Dollar Quantity"].append
+        prices_per_coin = self.price_meta_data.prices_per_coin
+
         for coin, balance in balance_by_coin.items():
-            if "USD" in coin:
-                data_to_return["Symbol"].append("USD")
-                data_to_return["Multiplier"].append(1)
-                data_to_return["Quantity"].append(round(balance, 3))
-                data_to_return["Dollar Quantity"].append(round(balance,3 ))
+            quantity = round(balance, 3)
+            append_multiplier(1)
+            append_quantity(quantity)
+            if coin in self.usd_coins:
+                append_symbol("USD")
+                append_dollar_quantity(quantity)
             else:
-                price = self.price_meta_data.prices_per_coin[coin]["usd"]
-                data_to_return["Symbol"].append(coin)
-                data_to_return["Multiplier"].append(1)
-                data_to_return["Quantity"].append(round(balance, 3))
-                data_to_return["Dollar Quantity"].append(round(float(balance) * float(price),3))
+                append_symbol(coin)
+                append_dollar_quantity(round(float(balance) * float(prices_per_coin[coin]["usd"]), 3))
         
         return data_to_return
 
-    def get_prices_for_coins(self, balance_by_coin: Dict[str, float]) -> None:
+    def get_prices_for_coins(self, balance_by_coin: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+        #fetching all but stablecoins usd denominated
+        coins_to_fetch_price_for: List[str] = [coin for coin, _ in balance_by_coin.items() if coin not in self.usd_coins]
+
         if self.price_meta_data:
-            if self.price_meta_data.is_acceptable_timestamp_detla(self.delta_in_seconds_allowed):
+            if self.price_meta_data.is_acceptable_timestamp_delta(self.delta_in_seconds_allowed):
+                # prices are still fresh, only coins that entered the portfolio since are fetched
+                missing_coins: List[str] = [coin for coin in coins_to_fetch_price_for if coin not in self.price_meta_data.prices_per_coin]
+                if missing_coins:
+                    self.price_meta_data.prices_per_coin.update(self.price_fetcher.get_prices(missing_coins))
                 return self.price_meta_data.prices_per_coin
-        
-        #fetching all but stablecoins usd denominated
-        coins_to_fetch_price_for: List[str] = [coin for coin, _ in balance_by_coin.items() if "USD" not in coin]
 
         price_per_coin = self.price_fetcher.get_prices(coins_to_fetch_price_for)
 
-        dt = datetime.utcnow()
-
         self.price_meta_data = priceMetaData(
-            timestamp=dt,
+            timestamp=monotonic(),
             prices_per_coin=price_per_coin
         )
 
+        return price_per_coin
+
     #Below is to debug helios client
     def encode_token_balances_by_coin_calls(self):
         calls: List[str] = []
@@ -226,7 +224,7 @@ class DataFetcher(ExchangeBase):
 
         for coin, contract in self.contract_by_coin.items():
             for my_address in self.address_of_interest: 
-                    result = contract.functions.balanceOf(Web3.to_checksum_address(my_address)).call()
+                    result = contract.functions.balanceOf(my_address).call()
                     if coin in balance_by_coin.keys():
                         balance_by_coin[coin.upper()] += int(result) / 10 ** self.__DECIMAL_BY_COIN[coin.upper()]
                     else:
@@ -1,5 +1,4 @@
 from abc import ABC, abstractmethod
-import json
 import logging
 import time
 from typing import Optional
@@ -8,6 +7,7 @@ from setproctitle import setproctitle
 import zmq
 
 from infrastructure.log_handler import fetch_logging_config
+from infrastructure.message_codec import MSGPACK, encode_message
 
 #TODO: For now, we only enforce two methods implementation, namely fetch_balance and fetch_positions. As such, process_request is quite statically defined as well. How could we untangle both so that we can define more abstract methods and have the process_request understands what to fetch dynamically.
 class ExchangeBase(ABC):
@@ -20,8 +20,11 @@ class ExchangeBase(ABC):
         exchange (str): The name of the exchange, converted to lowercase.
         port_number (int): The port number for the ZMQ PUB socket.
         fetch_frequency (int): Time interval for data fetching, in seconds.
+        wire_format (bytes): Serialization used on the PUB socket, override with JSON for human-readable debugging.
     """
+    __slots__ = ("exchange", "port_number", "fetch_frequency", "logger")
     __PROCESS_PREFIX = "fetch_"
+    wire_format: bytes = MSGPACK
     def __init__(self, port_number: int, exchange: str, fetch_frequency: int = 60*60) -> None:
         """    
         Initialize the ExchangeBase object.
@@ -31,8 +34,9 @@ class ExchangeBase(ABC):
             exchange (str): The name of the exchange.
             fetch_frequency (int, optional): Time interval for data fetching, in seconds. Defaults to 60*60.
         """
-        setproctitle(self.__PROCESS_PREFIX + exchange.lower())
-        self.exchange: str = exchange.lower()
+        exchange = exchange.lower()
+        setproctitle(f"{self.__PROCESS_PREFIX}{exchange}")
+        self.exchange: str = exchange
         self.port_number = port_number
         self.fetch_frequency = fetch_frequency
         self.logger = self.init_logging()
@@ -81,7 +85,7 @@ class ExchangeBase(ABC):
 
         This function sets up a zmq.PUB socket and then enters an infinite loop. 
         In each iteration, it fetches the balance and positions from the exchange, 
-        constructs a message, and publishes it to the specified port.
+        constructs a message, and publishes it to the specified port as [topic, wire format, payload] frames.
         Iteration gaps are defined by self.fetch_frequency.
 
         Args:
@@ -110,9 +114,9 @@ class ExchangeBase(ABC):
                     "positions": positions_data 
                 }
 
-                self.logger.debug(f"Sending {self.exchange}: {msg=}")
+                self.logger.debug("Sending %s: msg=%r", self.exchange, msg)
 
-                socket.send_multipart([b"balance_and_positions", json.dumps(msg).encode()])
+                socket.send_multipart([b"balance_and_positions", self.wire_format, encode_message(msg, self.wire_format)])
 
                 # Sleep or wait for a signal to fetch the next data
                 time.sleep(self.fetch_frequency) # 1 hours
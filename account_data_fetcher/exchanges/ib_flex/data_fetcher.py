@@ -1,131 +1,410 @@
-from datetime import timezone, datetime, timedelta
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, timezone, datetime
+import fcntl
+import hashlib
+import io
+import json
 import logging
 import os
-from requests.exceptions import ReadTimeout
-from time import sleep
-from typing import Optional
+from time import monotonic, sleep, time
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
 
-from ibflex import parser as ibparser
-from ibflex import client
-from ibflex.Types import OpenPosition, FlexQueryResponse, FlexStatement
-from ibflex.client import ResponseCodeError
+# ibflex, requests, lxml, numpy and tenacity are imported where first used, keeping the factory launch light
+if TYPE_CHECKING:
+    import requests
+    from ibflex.Types import OpenPosition, FlexQueryResponse, FlexStatement
+    from ibflex.client import StatementAccess
 
 from account_data_fetcher.exchanges.exchange_base import ExchangeBase
 from infrastructure.api_secret_getter import ApiMetaData
 
 class DataFetcher(ExchangeBase):
-    __HOURS_DIFFERENCE_FROM_UTC = -5
+    __slots__ = ("account_and_query_ids", "balance_object", "positions_object", "_utc_offset_by_date", "_parsed_by_digest")
+    # whenGenerated is reported in New York time, EST or EDT depending on the date
+    __IB_TIMEZONE = ZoneInfo("America/New_York")
+    __MAX_STATEMENT_AGE_SECONDS = 120
+    __REQUEST_TIMEOUT_SECONDS = 15
+    # statements are verbose XML; requests transparently inflates gzip/deflate bodies
+    __FLEX_HEADERS = {"user-agent": "Java", "Accept-Encoding": "gzip, deflate"}
+    __PARSED_CACHE_SIZE = 2
+    __ROOT_TAG_SNIFF_BYTES = 512
+    __MAX_THROTTLE_BACKOFF_SECONDS = 30
+    __MAX_DOWNLOAD_ATTEMPTS = 21
+    # wall-clock budget across all attempts and polls, so a long outage or a stuck statement fails the fetch instead of stalling the process
+    __DOWNLOAD_BUDGET_SECONDS = 10 * 60
+    __CACHE_DIRECTORY = os.path.expanduser("~/.cache/ib_flex")
+    # ReferenceCodes issued but not yet downloaded, so a restart resumes polling instead of regenerating the statement
+    __PENDING_REFERENCE_CODES_PATH = os.path.join(__CACHE_DIRECTORY, "reference_codes.json")
+    # sidecar lock serialising the read-modify-replace of the pending ReferenceCodes across fetcher processes
+    __PENDING_REFERENCE_CODES_LOCK_PATH = os.path.join(__CACHE_DIRECTORY, "reference_codes.lock")
+    __PENDING_REFERENCE_CODE_TTL_SECONDS = 10 * 60
+    __EXPIRED_REFERENCE_CODE_ERRORS = ("1003", "1017", "1021")
     __EXCHANGE= "IB"
+    # created on first download, then shared by every flex request of the process
+    _SESSION: Optional["requests.Session"] = None
 
     def __init__(self, secrets: ApiMetaData, port_number: int) -> None:
         super().__init__(port_number, self.__EXCHANGE)
         self.__get_account_and_query_ids(secrets)
         self.logger = logging.getLogger(__name__)
-        self.balance_object: Optional[FlexStatement] = None
-        self.positions_object: Optional[FlexStatement] = None
+        self.balance_object: Optional["FlexStatement"] = None
+        self.positions_object: Optional["FlexStatement"] = None
+        self._utc_offset_by_date: Dict[date, float] = {}
+        self._parsed_by_digest: "OrderedDict[bytes, FlexQueryResponse]" = OrderedDict()
+
+    @classmethod
+    def _get_session(cls) -> "requests.Session":
+        """Keep-alive session shared by every flex request, so polling reuses one TLS connection."""
+        if cls._SESSION is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.headers.update(cls.__FLEX_HEADERS)
+            # retries are handled by get_data, the adapter must not silently re-send
+            session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=0))
+            atexit.register(session.close)
+            cls._SESSION = session
+        return cls._SESSION
 
     def __get_account_and_query_ids(self, secrets: ApiMetaData) -> None:
+        # a combined query reports both ChangeInNAV and OpenPositions, halving statement generations
         self.account_and_query_ids: dict = {
             "token" : secrets.other_fields["Token"],
-            "query_id_balance" : secrets.other_fields["Balance_query_id"],
-            "query_id_position" : secrets.other_fields["Position_query_id"]
+            "query_id_combined" : secrets.other_fields.get("Combined_query_id"),
+            "query_id_balance" : secrets.other_fields.get("Balance_query_id"),
+            "query_id_position" : secrets.other_fields.get("Position_query_id")
         }
+        # checked here so a missing query id fails at launch, rather than being sent to IB on the first fetch
+        if not self.account_and_query_ids["query_id_combined"] and not (
+            self.account_and_query_ids["query_id_balance"] and self.account_and_query_ids["query_id_position"]
+        ):
+            raise ValueError("IB flex secrets need either Combined_query_id, or both Balance_query_id and Position_query_id")
 
     def update_balance_and_get_ib_datetime(self) -> datetime:
-        if not self.is_acceptable_timestamp_detla(self.balance_object, "BALANCE"):
+        if not self.is_acceptable_timestamp_detla(self.balance_object):
             self.get_balance_object()
         return self.balance_object.whenGenerated
 
     def update_positions_and_get_ib_datetime(self) -> datetime:
-        if not self.is_acceptable_timestamp_detla(self.positions_object, "POSITIONS"):
+        if not self.is_acceptable_timestamp_detla(self.positions_object):
             self.get_positions_object()
         return self.positions_object.whenGenerated
 
     def fetch_balance(self, accountType = None) -> float:
-        if not self.is_acceptable_timestamp_detla(self.balance_object, "BALANCE"):
+        if not self.is_acceptable_timestamp_detla(self.balance_object):
             self.get_balance_object()
         
-        self.logger.debug(
-            f"{self.balance_object=}"
-        )
+        self.logger.debug("self.balance_object=%r", self.balance_object)
         return round(float(self.balance_object.ChangeInNAV.endingValue),3)
 
     def fetch_positions(self, accountType = None) -> dict:
-        if not self.is_acceptable_timestamp_detla(self.positions_object, "POSITIONS"):
+        if not self.is_acceptable_timestamp_detla(self.positions_object):
             self.get_positions_object()
         #denominate in usd so multiply by FXRateToBase, get columns: Symbol, Multiplier, Quantity, MarkPrice, CostBasisPrice, FifoPnlUnrealized
-        stmt: OpenPosition = self.positions_object.OpenPositions
-        self.logger.debug(stmt)
-
-        data_to_return = {
-            "Symbol": [],
-            "Multiplier": [],
-            "Quantity": [],
-            "Dollar Quantity": []
-        }
+        stmt: "OpenPosition" = self.positions_object.OpenPositions
+        self.logger.debug("%r", stmt)
 
-        for position in stmt:
-            data_to_return["Symbol"].append(position.symbol)
-            data_to_return["Multiplier"].append(int(position.multiplier))
-            data_to_return["Quantity"].append(int(position.position))
-            data_to_return["Dollar Quantity"].append(round(float(position.markPrice) * float(position.multiplier) * int(position.position),3))
-        
-        return data_to_return
+        import numpy as np
+
+        # single pass over the positions to build the columns, then compute Dollar Quantity vectorised
+        rows = [(position.symbol, float(position.multiplier), int(position.position), float(position.markPrice)) for position in stmt]
+        symbols, multipliers, quantities, mark_prices = zip(*rows) if rows else ((), (), (), ())
+        # the product keeps fractional multipliers (e.g. 0.01 on bonds), only the reported column is truncated
+        multipliers = np.array(multipliers, dtype=np.float64)
+        quantities = np.array(quantities, dtype=np.int64)
+        dollar_quantities = np.round(np.array(mark_prices, dtype=np.float64) * multipliers * quantities, 3)
+
+        return {
+            "Symbol": list(symbols),
+            "Multiplier": [int(multiplier) for multiplier in multipliers.tolist()],
+            "Quantity": quantities.tolist(),
+            "Dollar Quantity": dollar_quantities.tolist()
+        }
 
     def get_balance_object(self) -> None:
+        if self.account_and_query_ids["query_id_combined"]:
+            return self.get_combined_object()
         data = self.get_and_parse_data(self.account_and_query_ids["token"], self.account_and_query_ids["query_id_balance"])
         self.balance_object = data.FlexStatements[0]
-        self.logger.debug(self.balance_object)
+        self.logger.debug("%r", self.balance_object)
 
     def get_positions_object(self) -> None:
+        if self.account_and_query_ids["query_id_combined"]:
+            return self.get_combined_object()
         data = self.get_and_parse_data(self.account_and_query_ids["token"], self.account_and_query_ids["query_id_position"])
         self.positions_object = data.FlexStatements[0]
-        self.logger.debug(self.positions_object)
+        self.logger.debug("%r", self.positions_object)
+
+    def get_combined_object(self) -> None:
+        data = self.get_and_parse_data(self.account_and_query_ids["token"], self.account_and_query_ids["query_id_combined"])
+        self.balance_object = self.positions_object = data.FlexStatements[0]
+        self.logger.debug("%r", self.balance_object)
 
-    def is_acceptable_timestamp_detla(self, object_to_check: Optional[FlexStatement], query_type: str = "BALANCE") -> bool:
-        if not object_to_check:
+    def is_acceptable_timestamp_detla(self, object_to_check: Optional["FlexStatement"]) -> bool:
+        if object_to_check is None:
             return False
 
-        dt = datetime.utcnow()
+        # whenGenerated is a naive datetime expressed in IB's timezone, shift it to a UTC epoch
+        when_generated = object_to_check.whenGenerated
+        generated_at = when_generated.replace(tzinfo=timezone.utc).timestamp() - self.__get_utc_offset_seconds(when_generated.date())
+        return time() - generated_at < self.__MAX_STATEMENT_AGE_SECONDS
 
-        if query_type == "BALANCE":
-            delta: timedelta = (dt + timedelta(hours=self.__HOURS_DIFFERENCE_FROM_UTC)) - object_to_check.whenGenerated 
-            return delta.total_seconds() < 120
-        if query_type == "POSITIONS":
-            delta: timedelta = (dt + timedelta(hours=self.__HOURS_DIFFERENCE_FROM_UTC)) - object_to_check.whenGenerated 
-            return delta.total_seconds() < 120
+    def __get_utc_offset_seconds(self, day: date) -> float:
+        """IB timezone offset of a given day, resolved through tzdata once per day then served from a dict."""
+        offset = self._utc_offset_by_date.get(day)
+        if offset is None:
+            offset = self.__IB_TIMEZONE.utcoffset(datetime(day.year, day.month, day.day, 12)).total_seconds()
+            self._utc_offset_by_date[day] = offset
+        return offset
     
     def get_and_parse_data(self, token, query_id):
         data = self.get_data(token, query_id)
         return self.parse_data(data)
 
-    def get_data(self, token, query_id):
-        counter: int = 0
-        data: Optional[bytes] = None
-        while not data:
-            if counter <= 20:
-                counter += 1
-                try:
-                    return client.download(token, query_id)
-                except ResponseCodeError as e:
-                    if int(e.code) == 1018:
-                        self.logger.debug(e)
-                        sleep(5)
-                        continue
-                    else:
-                        raise Exception(f"Unusual error {e}")
-                except ReadTimeout as e:
-                    self.logger.debug(e)
-                    sleep(15)
-                    continue
-            else:
-                raise Exception("Kept on getting errors")
-    
-    
-    def parse_data(self, data) -> FlexQueryResponse:
-        cleansed_data = ibparser.parse(data)
+    def get_data(self, token, query_id) -> bytes:
+        """
+        Downloads a statement, retrying on token throttling (1018), timeouts and connection errors with jittered exponential backoff,
+        within both an attempt count and a total time budget.
+
+        Raises:
+            Exception: On any other flex error code, once the retries are exhausted, or if the statement is still not ready once the budget is spent.
+        """
+        from ibflex.client import ResponseCodeError
+        from tenacity import RetryError, Retrying, retry_if_exception, stop_after_attempt, stop_after_delay, wait_random_exponential
+
+        deadline = monotonic() + self.__DOWNLOAD_BUDGET_SECONDS
+        retrying = Retrying(
+            stop=stop_after_attempt(self.__MAX_DOWNLOAD_ATTEMPTS) | stop_after_delay(self.__DOWNLOAD_BUDGET_SECONDS),
+            wait=wait_random_exponential(multiplier=5, min=1, max=self.__MAX_THROTTLE_BACKOFF_SECONDS),
+            retry=retry_if_exception(self.__is_retryable_download_error),
+            before_sleep=lambda retry_state: self.logger.debug(retry_state.outcome.exception()),
+        )
+        try:
+            for attempt in retrying:
+                with attempt:
+                    return self._request_statement_and_poll(token, query_id, deadline)
+        except ResponseCodeError as e:
+            raise Exception(f"Unusual error {e}")
+        except RetryError as e:
+            raise Exception("Kept on getting errors") from e
+
+    @staticmethod
+    def __is_retryable_download_error(e: BaseException) -> bool:
+        from ibflex.client import ResponseCodeError
+        from requests.exceptions import ConnectionError, Timeout
+
+        # ibflex's own download retried any Timeout, connection drops are just as transient
+        return isinstance(e, (Timeout, ConnectionError)) or (isinstance(e, ResponseCodeError) and int(e.code) == 1018)
+
+    def _request_statement_and_poll(self, token: str, query_id: str, deadline: float) -> bytes:
+        """
+        Two-step flex download (SendRequest then GetStatement polling), mirroring ibflex.client.download
+        but going through the keep-alive session.
+        A ReferenceCode left pending by a previous run of the process is polled first, if still recent.
+        Polling gives up once time.monotonic() passes deadline.
+        """
+        from ibflex.client import ResponseCodeError
+
+        stmt_access = self.__load_pending_statement_access(query_id)
+        if stmt_access is not None:
+            try:
+                content = self.__poll_until_ready(stmt_access, token, deadline)
+                self.__store_pending_statement_access(query_id, None)
+                return content
+            except ResponseCodeError as e:
+                if e.code not in self.__EXPIRED_REFERENCE_CODE_ERRORS:
+                    raise
+                self.logger.debug(f"Pending ReferenceCode for {query_id=} is no longer usable: {e}")
+
+        stmt_access = self._request_statement(token, query_id)
+        self.__store_pending_statement_access(query_id, stmt_access)
+        content = self.__poll_until_ready(stmt_access, token, deadline)
+        self.__store_pending_statement_access(query_id, None)
+        return content
+
+    def __poll_until_ready(self, stmt_access: "StatementAccess", token: str, deadline: float) -> bytes:
+        status, content = 0, None
+        while status is not True:
+            # a statement stuck in generation (1019/1009) would otherwise be polled forever within a single attempt
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                raise Exception(f"Statement {stmt_access.ReferenceCode} still not ready after {self.__DOWNLOAD_BUDGET_SECONDS}s")
+            sleep(min(status, remaining))
+            status, content = self._poll_statement_once(stmt_access, token)
+        return content
+
+    @classmethod
+    def __read_pending_statement_accesses(cls) -> dict:
+        try:
+            with open(cls.__PENDING_REFERENCE_CODES_PATH, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def __load_pending_statement_access(self, query_id: str) -> Optional["StatementAccess"]:
+        from ibflex.client import StatementAccess
+
+        pending = self.__read_pending_statement_accesses().get(str(query_id))
+        if not pending or time() - pending["issued_at"] > self.__PENDING_REFERENCE_CODE_TTL_SECONDS:
+            return None
+        return StatementAccess(
+            timestamp=datetime.fromtimestamp(pending["issued_at"], timezone.utc),
+            ReferenceCode=pending["reference_code"],
+            Url=pending["url"]
+        )
+
+    def __store_pending_statement_access(self, query_id: str, stmt_access: Optional["StatementAccess"]) -> None:
+        """
+        Records (or clears, when stmt_access is None) the pending ReferenceCode of a query, written atomically.
+        The file is shared by every fetcher process, so the whole load, modify and replace runs under the sidecar lock.
+        """
+        try:
+            with self.__lock_pending_statement_accesses():
+                pending = self.__read_pending_statement_accesses()
+                if stmt_access is None:
+                    if pending.pop(str(query_id), None) is None:
+                        return
+                else:
+                    pending[str(query_id)] = {"reference_code": stmt_access.ReferenceCode, "url": stmt_access.Url, "issued_at": time()}
+                self.__write_cache_file(self.__PENDING_REFERENCE_CODES_PATH, json.dumps(pending).encode())
+        except OSError as e:
+            self.logger.debug(f"Could not lock {self.__PENDING_REFERENCE_CODES_LOCK_PATH}: {e}")
+
+    @classmethod
+    @contextmanager
+    def __lock_pending_statement_accesses(cls) -> Iterator[None]:
+        """Exclusive flock on the sidecar lock file, released when the block exits."""
+        os.makedirs(cls.__CACHE_DIRECTORY, exist_ok=True)
+        with open(cls.__PENDING_REFERENCE_CODES_LOCK_PATH, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __write_cache_file(self, path: str, data: bytes) -> None:
+        """Atomically replaces a cache file, the cache being best effort a failure is only logged."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.debug(f"Could not write cache file {path}: {e}")
+
+    def _request_statement(self, token: str, query_id: str) -> "StatementAccess":
+        """SendRequest step, returns the ReferenceCode and GetStatement url to poll."""
+        from ibflex import client
+        from ibflex.client import ResponseCodeError, StatementError
+
+        stmt_access = client.parse_stmt_response(self._submit_request(client.REQUEST_URL, token, query_id))
+        if isinstance(stmt_access, StatementError):
+            raise ResponseCodeError(stmt_access.ErrorCode, stmt_access.ErrorMessage)
+        return stmt_access
+
+    def _poll_statement_once(self, stmt_access: "StatementAccess", token: str) -> Tuple[Union[bool, int], bytes]:
+        """Single GetStatement attempt, returns (True, statement) when ready, else (seconds to wait, status response)."""
+        from ibflex import client
+
+        resp = self._submit_request(stmt_access.Url or client.STMT_URL, token, stmt_access.ReferenceCode)
+        content = resp.content
+        # a ready statement is recognised from its root tag, sparing check_statement_response a str() copy of the whole body
+        if resp.status_code == 200 and b"<FlexQueryResponse" in content[:self.__ROOT_TAG_SNIFF_BYTES]:
+            return True, content
+        return client.check_statement_response(resp), content
+
+    def _submit_request(self, url: str, token: str, query: str) -> "requests.Response":
+        return self._get_session().get(url, params={"v": "3", "t": token, "q": query}, timeout=self.__REQUEST_TIMEOUT_SECONDS)
+
+    def parse_data(self, data: bytes) -> "FlexQueryResponse":
+        # identical payloads (e.g. one query id serving both balance and positions) are only parsed once
+        digest = hashlib.blake2b(data, digest_size=8).digest()
+        if digest in self._parsed_by_digest:
+            self._parsed_by_digest.move_to_end(digest)
+            return self._parsed_by_digest[digest]
+
+        cleansed_data = self.__parse_flex_xml(data)
+
+        self._parsed_by_digest[digest] = cleansed_data
+        if len(self._parsed_by_digest) > self.__PARSED_CACHE_SIZE:
+            self._parsed_by_digest.popitem(last=False)
         return cleansed_data
 
+    def __parse_flex_xml(self, data: bytes) -> "FlexQueryResponse":
+        """
+        Stream-parses the statement with libxml2 when lxml is available, falls back to ibflex's own stdlib parser otherwise.
+        """
+        from ibflex import parser as ibparser
+        try:
+            from lxml import etree
+        except ImportError:
+            return ibparser.parse(data)
+
+        try:
+            return self.__iterparse_flex_xml(etree, data)
+        except (etree.XMLSyntaxError, ibparser.FlexParserError) as e:
+            self.logger.debug(f"lxml flex parsing failed, falling back to ibflex parser: {e}")
+            return ibparser.parse(data)
+
+    @staticmethod
+    def __iterparse_flex_xml(etree, data: bytes) -> "FlexQueryResponse":
+        """
+        Only converts what this fetcher reads: statement headers, ChangeInNAV and OpenPosition rows.
+        Every other section is dropped as soon as it is closed, so the live tree stays at a single element.
+
+        Args:
+            etree (module): lxml.etree.
+            data (bytes): Raw FlexQueryResponse XML.
+
+        Returns:
+            FlexQueryResponse: ibflex response whose statements carry whenGenerated, ChangeInNAV and OpenPositions.
+
+        Raises:
+            FlexParserError: If the document is not a FlexQueryResponse or an attribute can't be converted.
+        """
+        from ibflex import Types
+        from ibflex import parser as ibparser
+
+        def convert_attributes(Class, elem) -> dict:
+            return dict(ibparser.parse_element_attr(Class, k, v) for k, v in elem.attrib.items())
+
+        response_attributes: Optional[dict] = None
+        statement_attributes: dict = {}
+        change_in_nav = None
+        open_positions: list = []
+        statements: list = []
+
+        for event, elem in etree.iterparse(io.BytesIO(data), events=("start", "end"), remove_comments=True):
+            tag = elem.tag
+            if event == "start":
+                if tag == "FlexQueryResponse":
+                    response_attributes = convert_attributes(Types.FlexQueryResponse, elem)
+                elif tag == "FlexStatement":
+                    statement_attributes = convert_attributes(Types.FlexStatement, elem)
+                    change_in_nav, open_positions = None, []
+                continue
+
+            if tag == "ChangeInNAV":
+                change_in_nav = ibparser.parse_data_element(elem)
+            elif tag == "OpenPosition":
+                open_positions.append(ibparser.parse_data_element(elem))
+            elif tag == "FlexStatement":
+                statements.append(Types.FlexStatement(**statement_attributes, ChangeInNAV=change_in_nav, OpenPositions=tuple(open_positions)))
+
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+        if response_attributes is None:
+            raise ibparser.FlexParserError("Not a FlexQueryResponse")
+
+        return Types.FlexQueryResponse(**response_attributes, FlexStatements=tuple(statements))
+
 if __name__ == '__main__':
     from getpass import getpass
     log_filename= os.path.expanduser("~") + "/log/test.py"
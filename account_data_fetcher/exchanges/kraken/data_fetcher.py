@@ -1,32 +1,29 @@
 import dataclasses
-from datetime import datetime, timedelta
+import json
 import logging
+import math
 import os
-from typing import Dict, Optional
+from time import monotonic, time
+from typing import Dict, List, Optional, Tuple
 
 from account_data_fetcher.exchanges.kraken.kraken_connector import krakenApiConnector
 from account_data_fetcher.exchanges.exchange_base import ExchangeBase
 from infrastructure.api_secret_getter import ApiMetaData
 
+_USD_STABLE_TICKERS = frozenset({"USDC", "USDT", "DAI", "USD", "ZUSD"})
+
 @dataclasses.dataclass(init=True, eq=True, repr=True)
 class balanceMetaData:
-    timestamp: datetime
-    balance_per_coin: Dict[str, str]
+    timestamp: float
+    balance_per_coin: Dict[str, float]
     balance_per_coin_in_dollars: Dict[str, float]
 
-    def is_acceptable_timestamp_detla(self, delta_in_seconds_allowed) -> bool:
-
-            dt = datetime.utcnow()
-
-            delta: timedelta = dt - self.timestamp
-
-            return delta.total_seconds() < delta_in_seconds_allowed
+    def is_acceptable_timestamp_delta(self, delta_in_seconds_allowed) -> bool:
+        # timestamp is a time.monotonic() reading, immune to wall clock adjustments
+        return monotonic() - self.timestamp < delta_in_seconds_allowed
     
     def get_netliq(self) -> float:
-        netliq: float = 0.0
-        for _, balance in self.balance_per_coin_in_dollars.items():
-            netliq += balance
-        return round(netliq, 2)
+        return round(math.fsum(self.balance_per_coin_in_dollars.values()), 2)
 
     def get_position(self) -> dict:
         
@@ -36,17 +33,23 @@ class balanceMetaData:
             "Quantity": [],
             "Dollar Quantity": []
         }
+        # bound once, rather than four dict lookups per coin
+        append_symbol = data_to_return["Symbol"].append
+        append_multiplier = data_to_return["Multiplier"].append
+        append_quantity = data_to_return["Quantity"].append
+        append_dollar_quantity = data_to_return["Dollar Quantity"].append
+        balance_per_coin_in_dollars = self.balance_per_coin_in_dollars
 
         for coin, balance in self.balance_per_coin.items():
             
-            quantity = round(float(balance),3)
-            dollar_quantity = round(self.balance_per_coin_in_dollars[coin], 3)
+            quantity = round(balance,3)
+            dollar_quantity = round(balance_per_coin_in_dollars[coin], 3)
             
             if dollar_quantity > 100:
-                data_to_return["Symbol"].append(coin if coin not in ["USDC", "USDT", "DAI", "USD", "ZUSD"] else "USD")
-                data_to_return["Multiplier"].append(1)
-                data_to_return["Quantity"].append(quantity)
-                data_to_return["Dollar Quantity"].append(dollar_quantity)
+                append_symbol(coin if coin not in _USD_STABLE_TICKERS else "USD")
+                append_multiplier(1)
+                append_quantity(quantity)
+                append_dollar_quantity(dollar_quantity)
 
         return data_to_return
 
@@ -76,13 +79,19 @@ class DataFetcher(ExchangeBase):
     __INTERNAL_KRAKEN_MAP ={
         "XXBT":"XBTC",
     }
-    __NO_PRICE_MAP = ["ZGBP", "ZEUR"]
+    __NO_PRICE_MAP = frozenset({"ZGBP", "ZEUR"})
+    # quote currencies a coin is priced against, by order of preference
+    __QUOTE_PRIORITY = ("USD", "USDT", "USDC")
+    # pair listings rarely change, so they are kept on disk across restarts
+    __ASSET_PAIRS_CACHE_PATH = os.path.expanduser("~/.cache/kraken/asset_pairs.json")
+    __ASSET_PAIRS_TTL_SECONDS = 7 * 24 * 60 * 60
     def __init__(self, secrets: ApiMetaData, port_number: int, sub_account_name: Optional[str] = None) -> None:
         super().__init__(port_number, self._EXCHANGE)
         self.logger = logging.getLogger(__name__) 
         self._subaccount_name = sub_account_name
         self.kraken_connector = krakenApiConnector(api_key=secrets.key, api_secret=secrets.secret)
         self.balance_meta_data: Optional[balanceMetaData] = None
+        self._asset_pairs_cache: Tuple[float, Dict[str, List[str]]] = (float("-inf"), {})
 
     def fetch_balance(self, accountType: str = "SPOT") -> float:
         self.__update_balances(accountType)
@@ -96,7 +105,7 @@ class DataFetcher(ExchangeBase):
 
     def __check_and_update_balances(self, delta_in_seconds: int = 120) -> balanceMetaData:
         if self.balance_meta_data:
-            if self.balance_meta_data.is_acceptable_timestamp_detla(delta_in_seconds):
+            if self.balance_meta_data.is_acceptable_timestamp_delta(delta_in_seconds):
                 return self.balance_meta_data.balance_per_coin
 
         balance_per_coin = self.filter_balance_dict(self.kraken_connector.get_balance())
@@ -104,66 +113,106 @@ class DataFetcher(ExchangeBase):
         balance_per_coin_dollar = self.get_balance_per_ticker_in_dollars(balance_per_coin)
         
         self.balance_meta_data: balanceMetaData = balanceMetaData(
-            timestamp=datetime.utcnow(),
+            timestamp=monotonic(),
             balance_per_coin= balance_per_coin,
             balance_per_coin_in_dollars=balance_per_coin_dollar
         )
         
     def get_balance_per_ticker_in_dollars(self, balances: dict) -> dict:
         dollar_balances: dict = {}
-        prices: dict = self.kraken_connector.get_ticker()
+        prices: Dict[str, float] = self.__get_price_index()
 
         for token, balance in balances.items():
-            if token in ["USDC", "USDT", "DAI", "USD", "ZUSD"]:
-                dollar_balances["USD"] = float(balance)
+            if token in _USD_STABLE_TICKERS:
+                dollar_balances["USD"] = balance
             elif token in self.__INTERNAL_KRAKEN_MAP:
-                dollar_balances[self.__KRAKEN_TICKER_TO_OTHERS[token]] = float(balance) * self.__get_coin_price(self.__INTERNAL_KRAKEN_MAP[token], prices)
+                dollar_balances[self.__KRAKEN_TICKER_TO_OTHERS[token]] = balance * prices.get(self.__INTERNAL_KRAKEN_MAP[token])
             else:
                 if token not in self.__NO_PRICE_MAP:
-                    dollar_balances[token] = float(balance) * self.__get_coin_price(token, prices)
+                    dollar_balances[token] = balance * prices.get(token)
 
         return self.filter_balance_dict(dollar_balances)
 
-    def filter_balance_dict(self, balances) -> dict:
-        key_to_modify: set = set()
-        key_to_erase: set = set()
-
-        for key, balance in balances.items():
-            if key in self.__KRAKEN_TICKER_TO_OTHERS:
-                key_to_modify.add(key)
-            if key in self.__NO_PRICE_MAP or  float(balance) < 0.001:
-                key_to_erase.add(key)
-        
-        for key in key_to_erase:
-            balances.pop(key)                
+    def __get_price_index(self) -> Dict[str, float]:
+        return self.__build_price_index(self.kraken_connector.get_ticker(), self.__get_asset_pairs())
 
-        for key in key_to_modify:
-            if key in balances:
-                balance = balances.pop(key)
-                balances[self.__KRAKEN_TICKER_TO_OTHERS[key]] = balance
+    def __get_asset_pairs(self) -> Dict[str, List[str]]:
+        """
+        Returns {pair: [base, quote]} as listed by /0/public/AssetPairs, read from disk while the cached copy is recent.
+        """
+        fetched_at, asset_pairs = self._asset_pairs_cache
+        if time() - fetched_at < self.__ASSET_PAIRS_TTL_SECONDS:
+            return asset_pairs
 
-        return balances
-
-    def fetch_positions(self, accountType: str = "SPOT") -> dict:
-        self.__update_balances(accountType)
-        return self.balance_meta_data.get_position()
-    
-    @staticmethod
-    def __get_coin_price(coin: str, price_dict: dict) -> float:
         try:
-            return float(price_dict[coin+"USD"]["c"][0])
-        except KeyError:
+            fetched_at = os.path.getmtime(self.__ASSET_PAIRS_CACHE_PATH)
+            if time() - fetched_at < self.__ASSET_PAIRS_TTL_SECONDS:
+                with open(self.__ASSET_PAIRS_CACHE_PATH, "r") as f:
+                    self._asset_pairs_cache = (fetched_at, json.load(f))
+                return self._asset_pairs_cache[1]
+        except (OSError, ValueError):
             pass
 
-        try:
-            return float(price_dict[coin+"USDT"]["c"][0])
-        except KeyError:
-            pass
+        asset_pairs = {pair: [listing["base"], listing["quote"]] for pair, listing in self.kraken_connector.get_asset_pairs().items()}
+        self._asset_pairs_cache = (time(), asset_pairs)
 
+        tmp_path = f"{self.__ASSET_PAIRS_CACHE_PATH}.{os.getpid()}.tmp"
         try:
-            return float(price_dict[coin+"USDC"]["c"][0])
-        except KeyError:
-            pass
+            os.makedirs(os.path.dirname(self.__ASSET_PAIRS_CACHE_PATH), exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(asset_pairs, f)
+            os.replace(tmp_path, self.__ASSET_PAIRS_CACHE_PATH)
+        except OSError as e:
+            self.logger.debug(f"Could not cache kraken asset pairs: {e}")
+        return asset_pairs
+
+    @classmethod
+    def __split_pair(cls, pair: str, asset_pairs: Dict[str, List[str]]) -> Optional[Tuple[str, str]]:
+        """Base and quote of a pair, from the listing when known, else by stripping a known quote suffix."""
+        if pair in asset_pairs:
+            base, quote = asset_pairs[pair]
+            return cls.__KRAKEN_TICKER_TO_OTHERS.get(base, base), cls.__KRAKEN_TICKER_TO_OTHERS.get(quote, quote)
+        for quote in cls.__QUOTE_PRIORITY:
+            if pair.endswith(quote) and len(pair) > len(quote):
+                return pair[:-len(quote)], quote
+        return None
+
+    @classmethod
+    def __build_price_index(cls, ticker: dict, asset_pairs: Dict[str, List[str]]) -> Dict[str, float]:
+        """
+        Inverts the ticker into {base coin: last traded price}, in one pass over the pairs.
+
+        Args:
+            ticker (dict): Kraken ticker, keyed by pair name.
+            asset_pairs (Dict[str, List[str]]): Base and quote asset of each pair, e.g. {"XXBTZUSD": ["XXBT", "ZUSD"]}.
+
+        Returns:
+            Dict[str, float]: Last price of each base coin, against the most preferred quote it trades in.
+        """
+        price_index: Dict[str, float] = {}
+        quote_rank_per_coin: Dict[str, int] = {}
+        for pair, pair_ticker in ticker.items():
+            split = cls.__split_pair(pair, asset_pairs)
+            if split is None or split[1] not in cls.__QUOTE_PRIORITY:
+                continue
+            coin, quote = split
+            rank = cls.__QUOTE_PRIORITY.index(quote)
+            if rank < quote_rank_per_coin.get(coin, len(cls.__QUOTE_PRIORITY)):
+                quote_rank_per_coin[coin] = rank
+                price_index[coin] = float(pair_ticker["c"][0])
+        return price_index
+
+    def filter_balance_dict(self, balances) -> dict:
+        # drops dust and unpriced fiat, renames kraken tickers and parses the balances to float, in a single pass
+        return {
+            self.__KRAKEN_TICKER_TO_OTHERS.get(key, key): amount
+            for key, balance in balances.items()
+            if key not in self.__NO_PRICE_MAP and (amount := float(balance)) >= 0.001
+        }
+
+    def fetch_positions(self, accountType: str = "SPOT") -> dict:
+        self.__update_balances(accountType)
+        return self.balance_meta_data.get_position()
 
 if __name__ == "__main__":
     from getpass import getpass
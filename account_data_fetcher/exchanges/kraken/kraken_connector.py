@@ -4,6 +4,8 @@ import hashlib
 import hmac
 from json.decoder import JSONDecodeError
 import logging
+import orjson
+import random
 from requests.exceptions import ReadTimeout, SSLError, ConnectionError
 from requests import Response
 import time
@@ -15,6 +17,9 @@ from utilities.request_handler import requestHandler
 
 class krakenApiConnector:
     __ENDPOINT="https://api.kraken.com"
+    __MAX_RETRY_DELAY = 30
+    # kraken's rate limit counter decays by about one call every 3 seconds
+    __RATE_LIMIT_MIN_DELAY = 3
     
     def __init__(self, api_key: str, api_secret: str, max_retries: int = 10, 
                 force_retry: bool = True, retry_delay: int = 3, retry_codes: Optional[set] = None) -> None:
@@ -22,14 +27,16 @@ class krakenApiConnector:
         self.__request_handler: requestHandler = requestHandler()
         self.api_key: str = api_key
         self.api_secret: str = api_secret
+        # keyed once, each signature then copies the primed hmac instead of decoding and rekeying
+        self.__hmac_template = hmac.new(base64.b64decode(api_secret), digestmod=hashlib.sha512)
         self.max_retries: int = max_retries
         self.force_retry: bool = force_retry
         self.retry_delay: int = retry_delay
+        self.__last_nonce: int = 0
 
         # Set whitelist of non-fatal Bybit status codes to retry on.
         if retry_codes is None:
-            start = "EOrder:"
-            self.retry_codes = {start+"Rate limit exceeded",}
+            self.retry_codes = {"EOrder:Rate limit exceeded", "EAPI:Rate limit exceeded"}
         else:
             self.retry_codes = retry_codes
 
@@ -57,6 +64,18 @@ class krakenApiConnector:
 
         return response["result"]
 
+    def get_asset_pairs(self, **kwargs) -> dict[str, dict]:
+        module = "/0/public/AssetPairs"
+
+        response = self.__prepare_and_handle_request(
+            method="get",
+            path_extension=module,
+            req_params=kwargs,
+            is_private=False
+        )
+
+        return response["result"]
+
     def __generate_headers(self, params: dict, url_path: str) -> dict:
         return {
             "API-Key": self.api_key,
@@ -64,29 +83,39 @@ class krakenApiConnector:
             'Content-Type': 'application/x-www-form-urlencoded; charset=utf-8'
         }
 
-    def __get_utc_timestamp_milliseconds(self) -> str:
-        return str(int(time.time() * 10 ** 3))
+    def __get_nonce(self) -> str:
+        """Millisecond timestamp, bumped past the previous nonce so bursts within a millisecond stay strictly increasing."""
+        nonce = max(time.time_ns() // 1_000_000, self.__last_nonce + 1)
+        self.__last_nonce = nonce
+        return str(nonce)
 
     def __sign(self, params: dict, url_path: str) -> str:
-        postdata = urllib.parse.urlencode(params)
-        encoded = (str(params['nonce']) + postdata).encode()
-        message = url_path.encode() + hashlib.sha256(encoded).digest()
-
-        mac = hmac.new(base64.b64decode(self.api_secret), message, hashlib.sha512)
-        sigdigest = base64.b64encode(mac.digest())
-        return sigdigest.decode()
+        # most calls only carry the nonce, which is digits and needs no escaping
+        postdata = f"nonce={params['nonce']}" if len(params) == 1 else urllib.parse.urlencode(params)
+        # the nonce and postdata, then path and digest, are fed in place rather than concatenated
+        inner = hashlib.sha256(str(params['nonce']).encode())
+        inner.update(postdata.encode())
+
+        mac = self.__hmac_template.copy()
+        mac.update(url_path.encode())
+        mac.update(inner.digest())
+        return base64.b64encode(mac.digest()).decode("ascii")
+
+    def __get_retry_delay(self, retries_attempted: int) -> float:
+        """Exponential in the attempt number, capped, and jittered so that retries from several clients do not align."""
+        attempt = self.max_retries - retries_attempted
+        return min(self.__MAX_RETRY_DELAY, self.retry_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
 
     def __prepare_and_handle_request(self, method: str, path_extension: str, req_params: dict, is_private: bool = True):
 
         # Send request and return headers with body. Retry if failed.
         retries_attempted = self.max_retries
+        url = self.__ENDPOINT + path_extension
 
         while True:
             if is_private:
-                req_params["nonce"] = self.__get_utc_timestamp_milliseconds()
+                req_params["nonce"] = self.__get_nonce()
                 headers = self.__generate_headers(req_params, path_extension)
-            
-            url = self.__ENDPOINT + path_extension
 
             retries_attempted -= 1
             if retries_attempted < 0:
@@ -121,19 +150,20 @@ class krakenApiConnector:
             ) as e:
                 if self.force_retry:
                     self.logger.error(f'{e}. {retries_attempted}')
-                    time.sleep(self.retry_delay)
+                    time.sleep(self.__get_retry_delay(retries_attempted))
                     continue
                 else:
                     raise e
 
             try:
-                response = raw_response.json()
+                # orjson.JSONDecodeError subclasses json's, so the handler below still applies
+                response = orjson.loads(raw_response.content)
 
             # If we have trouble converting, handle the error and retry.
             except JSONDecodeError as e:
                 if self.force_retry:
                     self.logger.error(f'{e}. {retries_attempted}')
-                    time.sleep(self.retry_delay)
+                    time.sleep(self.__get_retry_delay(retries_attempted))
                     continue
                 else:
                     raise FailedRequestError(
@@ -157,24 +187,15 @@ class krakenApiConnector:
                             error_msg += '. Added 2.5 seconds to recv_window'
                             self.__X_BAPI_RECV_WINDOW = str(int(self.__X_BAPI_RECV_WINDOW) + 2500)
 
-                        # 10006, ratelimit error; wait until rate_limit_reset_ms
-                        # and retry.
+                        # ratelimit error; kraken gives no reset time, so back off
+                        # with at least one counter decay period and retry.
                         elif "Rate limit exceeded" in response['error'][0]:
+                            err_delay = max(self.__RATE_LIMIT_MIN_DELAY, self.__get_retry_delay(retries_attempted))
                             self.logger.error(
                                 f'{response["error"]}. Ratelimited on current request. '
-                                f'Sleeping, then trying again. Request: {url}'
-                            )
-
-                            # Calculate how long we need to wait.
-                            limit_reset = response['rate_limit_reset_ms'] / 1000
-                            reset_str = time.strftime(
-                                '%X', time.localtime(limit_reset)
-                            )
-                            err_delay = int(limit_reset) - int(time.time())
-                            error_msg = (
-                                f'Ratelimit will reset at {reset_str}. '
-                                f'Sleeping for {err_delay} seconds'
+                                f'Sleeping for {err_delay:.1f} seconds, then trying again. Request: {url}'
                             )
+                            time.sleep(err_delay)
 
                     else:
                         raise InvalidRequestError(
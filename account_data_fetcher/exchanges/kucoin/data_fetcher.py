@@ -1,6 +1,7 @@
 import logging
 import os
-from typing import List, Optional
+from time import monotonic
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from account_data_fetcher.exchanges.kucoin.kucoin_connector import kucoinApiConnector
 from account_data_fetcher.exchanges.kucoin.exception import FailedRequestError, InvalidRequestError
@@ -8,14 +9,19 @@ from account_data_fetcher.exchanges.kucoin.exception import FailedRequestError,
 from account_data_fetcher.exchanges.exchange_base import ExchangeBase
 from infrastructure.api_secret_getter import ApiMetaData
 
+_USD_STABLE_TICKERS = frozenset({"BUSD", "USDC", "USDT"})
+
 #TODO make a config object to be parsed so that we can modify which account type to fetch
 class DataFetcher(ExchangeBase):
     _EXCHANGE = "KUCOIN"
     _ENDPOINT="https://api.kucoin.com"
+    # long enough to cover the back to back fetch_balance and fetch_positions of a publishing cycle
+    __WALLET_TTL_SECONDS = 10
     def __init__(self, secrets: ApiMetaData, port_number: int, sub_account_name: Optional[str] = None) -> None:
         super().__init__(port_number, self._EXCHANGE)
         self._subaccount_name = sub_account_name
         self.kucoin_connector = kucoinApiConnector(api_key=secrets.key, api_secret=secrets.secret, passphrase=secrets.other_fields["Passphrase"])
+        self._wallet_snapshot: Tuple[float, List[Tuple[str, float]], Dict[str, float]] = (float("-inf"), [], {})
 
     def fetch_balance(self, accountType="UNIFIED") -> float:
         netliq = self.__get_balances()
@@ -23,23 +29,18 @@ class DataFetcher(ExchangeBase):
     
     def __get_balances(self) -> float:
 
-        balances: List[dict] = self.kucoin_connector.get_wallet_balance()
+        balances, prices = self.__get_wallet_snapshot()
 
         spot_netliq: float = 0
 
-        for balance in balances:
-            
-            coin_balance = float(balance["balance"])
-
-            if not coin_balance:
-                continue
-                
-            name = balance["currency"]
+        for name, coin_balance in balances:
             
-            if name.upper() in ["BUSD", "USDC", "USDT"]:
+            if name.upper() in _USD_STABLE_TICKERS:
                 spot_netliq += coin_balance
+            elif (price := prices.get(name)) is None:
+                self.logger.warning(f"No kucoin price for {name}, left out of the netliq")
             else:
-                spot_netliq += coin_balance * self.__get_coin_price(name)
+                spot_netliq += coin_balance * price
 
         return round(spot_netliq)
         
@@ -54,28 +55,67 @@ class DataFetcher(ExchangeBase):
             "Dollar Quantity": []
         }
         
-        balances: List[dict] = self.kucoin_connector.get_wallet_balance()
+        # bound once, rather than four dict lookups per coin
+        append_symbol = data_to_return["Symbol"].append
+        append_multiplier = data_to_return["Multiplier"].append
+        append_quantity = data_to_return["Quantity"].append
+        append_dollar_quantity = data_to_return["Dollar Quantity"].append
+
+        balances, prices = self.__get_wallet_snapshot()
 
-        for balance in balances:
+        for name, coin_balance in balances:
             
-            quantity = round(float(balance["balance"]),3)
-            dollar_quantity = quantity if balance["currency"].upper() in ["BUSD", "USDC", "USDT"] else \
-                              quantity * self.__get_coin_price(balance["currency"])
+            quantity = round(coin_balance,3)
+
+            if not quantity:
+                continue
+
+            if name.upper() in _USD_STABLE_TICKERS:
+                dollar_quantity = quantity
+            elif (price := prices.get(name)) is None:
+                self.logger.warning(f"No kucoin price for {name}, left out of the positions")
+                continue
+            else:
+                dollar_quantity = quantity * price
             
             if dollar_quantity > 100: 
-                data_to_return["Symbol"].append(balance["currency"])
-                data_to_return["Multiplier"].append(1)
-                data_to_return["Quantity"].append(quantity)
-                data_to_return["Dollar Quantity"].append(dollar_quantity)
+                append_symbol(name)
+                append_multiplier(1)
+                append_quantity(quantity)
+                append_dollar_quantity(dollar_quantity)
                 
         return data_to_return    
 
-    def __get_coin_price(self, symbol: str) -> Optional[float]:
-        "starting with most likely, USDT unfort"
+    def __get_wallet_snapshot(self) -> Tuple[List[Tuple[str, float]], Dict[str, float]]:
+        "non zero (currency, balance) rows, one per account as kucoin reports them, and their prices, refetched once older than __WALLET_TTL_SECONDS"
+        fetched_at, balances, prices = self._wallet_snapshot
+        if monotonic() - fetched_at >= self.__WALLET_TTL_SECONDS:
+            balances = [
+                (account["currency"], amount)
+                for account in self.kucoin_connector.get_wallet_balance()
+                if (amount := float(account["balance"]))
+            ]
+            prices = self.__get_coin_prices(currency for currency, _ in balances)
+            self._wallet_snapshot = (monotonic(), balances, prices)
+        return balances, prices
+
+    def __get_coin_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        "one /prices call for every non-stable coin held, falling back to one call per coin if kucoin rejects the batch; unpriced coins are left out"
+        to_price = sorted({symbol for symbol in symbols if symbol.upper() not in _USD_STABLE_TICKERS})
+        if not to_price:
+            return {}
         try:
-            return float(self.kucoin_connector.get_last_traded_price(currencies=symbol)[symbol])
-        except InvalidRequestError:
-            pass 
+            prices = self.kucoin_connector.get_last_traded_price(currencies=",".join(to_price))
+        except InvalidRequestError as e:
+            # a single delisted or unknown symbol fails the whole batch, so only that coin should lose its price
+            self.logger.debug(f"Batched kucoin /prices rejected, pricing coins one by one: {e}")
+            prices = {}
+            for symbol in to_price:
+                try:
+                    prices.update(self.kucoin_connector.get_last_traded_price(currencies=symbol))
+                except InvalidRequestError:
+                    pass
+        return {symbol: float(price) for symbol, price in prices.items() if price is not None}
 
 if __name__ == "__main__":
     from getpass import getpass
@@ -4,6 +4,8 @@ import hashlib
 import hmac
 from json.decoder import JSONDecodeError
 import logging
+import orjson
+import random
 from requests.exceptions import ReadTimeout, SSLError, ConnectionError
 from requests import Response
 import time
@@ -14,6 +16,7 @@ from utilities.request_handler import requestHandler
 
 class kucoinApiConnector:
     __ENDPOINT="https://api.kucoin.com"
+    __MAX_RETRY_DELAY = 30
     
     def __init__(self, api_key: str, api_secret: str, passphrase:str,  max_retries: int = 10, 
                 force_retry: bool = True, retry_delay: int = 3, retry_codes: Optional[set] = None) -> None:
@@ -21,6 +24,8 @@ class kucoinApiConnector:
         self.__request_handler: requestHandler = requestHandler()
         self.api_key: str = api_key
         self.api_secret: str = api_secret
+        # keyed once, each signature then copies the primed hmac instead of encoding and rekeying
+        self.__hmac_template = hmac.new(api_secret.encode("utf-8"), digestmod=hashlib.sha256)
         self.api_passphrase: bytes = base64.b64encode(hmac.new(bytes(api_secret, "utf-8"), passphrase.encode("utf-8"),hashlib.sha256).digest())
 
  
@@ -79,21 +84,28 @@ class kucoinApiConnector:
         }
 
     def __get_utc_timestamp_milliseconds(self) -> str:
-        return str(int(time.time() * 10 ** 3))
+        return str(time.time_ns() // 1_000_000)
 
     def __sign(self, timestamp: str, params: dict, method: str, path:str) -> bytes:
 
         _val = '&'.join(
             [str(k) + '=' + str(v) for k, v in sorted(params.items()) if
              (k != 'sign') and (v is not None)]
-        )
+        ) if params else ""
 
         params_str = timestamp + method.upper() + "/" +  path +  _val
 
-        hash_hmac =  hmac.new(bytes(self.api_secret, "utf-8"), params_str.encode("utf-8"),hashlib.sha256).digest()
+        mac = self.__hmac_template.copy()
+        mac.update(params_str.encode("utf-8"))
+        hash_hmac = mac.digest()
 
         return base64.b64encode(hash_hmac)
 
+    def __get_retry_delay(self, retries_attempted: int) -> float:
+        """Exponential in the attempt number, capped, and jittered so that retries from several clients do not align."""
+        attempt = self.max_retries - retries_attempted
+        return min(self.__MAX_RETRY_DELAY, self.retry_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
     def __prepare_and_handle_request(self, method: str, module: str, req_params: dict):
 
         # Send request and return headers with body. Retry if failed.
@@ -130,19 +142,20 @@ class kucoinApiConnector:
             ) as e:
                 if self.force_retry:
                     self.logger.error(f'{e}. {retries_attempted}')
-                    time.sleep(self.retry_delay)
+                    time.sleep(self.__get_retry_delay(retries_attempted))
                     continue
                 else:
                     raise e
 
             try:
-                response = raw_response.json()
+                # orjson.JSONDecodeError subclasses json's, so the handler below still applies
+                response = orjson.loads(raw_response.content)
 
             # If we have trouble converting, handle the error and retry.
             except JSONDecodeError as e:
                 if self.force_retry:
                     self.logger.error(f'{e}. {retries_attempted}')
-                    time.sleep(self.retry_delay)
+                    time.sleep(self.__get_retry_delay(retries_attempted))
                     continue
                 else:
                     raise FailedRequestError(
@@ -1,7 +1,9 @@
 
 import argparse
+from functools import lru_cache
 from importlib import import_module
-import json
+
+import orjson
 
 from account_data_fetcher.launcher.process_factory_base import ProcessFactoryBase
 from infrastructure.api_secret_getter import ApiMetaData
@@ -11,19 +13,28 @@ class ProcessFactory(ProcessFactoryBase):
     __FILE_PREFIX = "account_data_fetcher.exchanges"
     _STANDARDIZED_CLASS_NAME = "DataFetcher" 
     __STANDARDIZED_FILE_NAME = "data_fetcher" 
+    __DEFAULT_IB_VARIANT = "ib_flex"
 
     @classmethod
+    @lru_cache(maxsize=None)
     def get_module_name(cls, process_name):
         """
         Gets the module name for a given process name.
 
+        Note:
+            A bare "ib" resolves to the default Interactive Brokers variant (flex queries),
+            the explicit "ib_flex" and "ib_async" names map to their own packages.
+
         Args:
             process_name (str): Name of the process.
             
         Returns:
             str: The full module name.
         """
-        return f"{cls.__FILE_PREFIX}.{process_name.lower()}.{cls.__STANDARDIZED_FILE_NAME}"
+        process_name = process_name.lower()
+        if process_name == "ib":
+            process_name = cls.__DEFAULT_IB_VARIANT
+        return f"{cls.__FILE_PREFIX}.{process_name}.{cls.__STANDARDIZED_FILE_NAME}"
 
     @classmethod
     def main(cls):
@@ -43,11 +54,13 @@ class ProcessFactory(ProcessFactoryBase):
         args = parser.parse_args()
 
         # Deserialize the JSON strings
-        args_dict = json.loads(args.args)
-        kwargs_dict = json.loads(args.kwargs)
+        args_dict = orjson.loads(args.args)
+        kwargs_dict = orjson.loads(args.kwargs)
 
-        # Deserialize the secrets JSON string to a dictionary
-        secrets_dict = json.loads(kwargs_dict["secrets"])
+        # Secrets are embedded as an object by the runner, older launchers sent them as a nested JSON string
+        secrets_dict = kwargs_dict["secrets"]
+        if isinstance(secrets_dict, str):
+            secrets_dict = orjson.loads(secrets_dict)
 
         # Convert the dictionary to the SecretsDataClass
         secrets_data_class_instance = ApiMetaData(**secrets_dict)
@@ -1,8 +1,9 @@
 import dataclasses
-from datetime import datetime, timedelta
 import json
 import logging
+import math
 import os
+from time import monotonic
 from typing import Dict, List, Optional
 
 from web3 import Web3
@@ -13,30 +14,21 @@ from account_data_fetcher.exchanges.coingecko.data_fetcher import DataFetcher as
 
 @dataclasses.dataclass(init=True, eq=True, repr=True)
 class balanceMetaData:
-    timestamp: datetime
+    timestamp: float
     balance_per_coin: Dict[str, float]
 
-    def is_acceptable_timestamp_detla(self, delta_in_seconds_allowed) -> bool:
-
-            dt = datetime.utcnow()
-
-            delta: timedelta = dt - self.timestamp
-
-            return delta.total_seconds() < delta_in_seconds_allowed
+    def is_acceptable_timestamp_delta(self, delta_in_seconds_allowed) -> bool:
+        # timestamp is a time.monotonic() reading, immune to wall clock adjustments
+        return monotonic() - self.timestamp < delta_in_seconds_allowed
 
 
 @dataclasses.dataclass(init=True, eq=True, repr=True)
 class priceMetaData:
-    timestamp: datetime
+    timestamp: float
     prices_per_coin: Dict[str, Dict[str, float]]
 
-    def is_acceptable_timestamp_detla(self, delta_in_seconds_allowed) -> bool:
-
-            dt = datetime.utcnow()
-
-            delta: timedelta = dt - self.timestamp 
-                
-            return delta.total_seconds() < delta_in_seconds_allowed
+    def is_acceptable_timestamp_delta(self, delta_in_seconds_allowed) -> bool:
+        return monotonic() - self.timestamp < delta_in_seconds_allowed
 
 class DataFetcher(ExchangeBase):
     __URL = "https://public-node.rsk.co"
@@ -50,8 +42,12 @@ class DataFetcher(ExchangeBase):
         self.price_meta_data: Optional[priceMetaData] = None
         self.balance_meta_data: Optional[balanceMetaData] = None
         self.w3 = Web3(Web3.HTTPProvider(self.__URL))
+        self.multicall_contract = self.w3.eth.contract(address=MULTICALL_3_ADDRESS, abi=MULTICALL3_ABI)
         self.contract_by_coin: dict = self.__get_contract_by_coin()
+        # usd denominated coins, classified once rather than substring-scanned on every pass
+        self.usd_coins: frozenset = frozenset(coin.upper() for coin in self.__ADDRESS_BY_COIN if "USD" in coin.upper())
         self.address_of_interest: list = self.__get_address_of_interest()
+        self.multi_calls: tuple = self.__get_multi_calls()
         self.delta_in_seconds_allowed: int = delta_in_seconds_allowed
         self.price_fetcher: coingeckoDataFetcher = coingeckoDataFetcher()
 
@@ -72,8 +68,9 @@ class DataFetcher(ExchangeBase):
         current_directory = os.path.dirname(__file__)
         path = os.path.abspath(os.path.join(current_directory, '..', '..', 'config', 'onchain_meta_data.json'))
 
+        # checksummed once here, rather than hashing every address on each balance query
         with open(path, "r") as f:
-            return json.load(f)['addresses_per_chain']["RSK"]
+            return [Web3.to_checksum_address(address) for address in json.load(f)['addresses_per_chain']["RSK"]]
             
 
     def fetch_balance(self) -> float:
@@ -81,45 +78,63 @@ class DataFetcher(ExchangeBase):
 
         self.logger.debug(f"{balance_by_coin=}")
         
-        netliq: float = 0
-        
         self.get_prices_for_coins(balance_by_coin)
-        
-        for coin, balance in balance_by_coin.items():
-            if "USD" in coin:
-                netliq += balance
-            else:
-                price = self.price_meta_data.prices_per_coin[coin]["usd"]
-                netliq += float(balance) * float(price)
-        
+        prices_per_coin = self.price_meta_data.prices_per_coin
+
+        netliq: float = math.fsum(
+            balance if coin in self.usd_coins else float(balance) * float(prices_per_coin[coin]["usd"])
+            for coin, balance in balance_by_coin.items()
+        )
+
         return round(netliq,3)
 
     def get_token_balances_by_coin(self, delta_in_seconds: int = 120) -> dict:
         if self.balance_meta_data:
-            if self.balance_meta_data.is_acceptable_timestamp_detla(delta_in_seconds):
+            if self.balance_meta_data.is_acceptable_timestamp_delta(delta_in_seconds):
                 return self.balance_meta_data.balance_per_coin
             
         balance_by_coin: dict[str, float] = {}
 
-        balance_by_coin["BTC"] = self.__get_btc_balances()
+        multi_call_result = iter(self.__query_multi_call())
 
-        for coin, contract in self.contract_by_coin.items():
-            for my_address in self.address_of_interest: 
-                    result = contract.functions.balanceOf(Web3.to_checksum_address(my_address)).call()
-                    if coin in balance_by_coin.keys():
-                        balance_by_coin[coin.upper()] += int(result) / 10 ** self.__DECIMAL_BY_COIN[coin.upper()]
-                    else:
-                        balance_by_coin[coin.upper()] = int(result) / 10 ** self.__DECIMAL_BY_COIN[coin.upper()]
+        balance_by_coin["BTC"] = sum(self.w3.to_int(next(multi_call_result)) for _ in self.address_of_interest) / 10 ** self.__DECIMAL_BY_COIN["BTC"]
+
+        for coin in self.contract_by_coin:
+            balance_by_coin[coin.upper()] = sum(self.w3.to_int(next(multi_call_result)) for _ in self.address_of_interest) / 10 ** self.__DECIMAL_BY_COIN[coin.upper()]
+
+        self.balance_meta_data = balanceMetaData(
+            timestamp=monotonic(),
+            balance_per_coin=balance_by_coin
+        )
 
         return balance_by_coin
 
-    def __get_btc_balances(self) -> dict:
-        balance: float = 0
-        
-        for my_address in self.address_of_interest:
-            balance +=  self.w3.eth.get_balance(Web3.to_checksum_address(my_address)) / (10 ** self.__DECIMAL_BY_COIN["BTC"])
+    def __get_multi_calls(self) -> tuple:
+        """
+        Encodes the balance reads once, addresses and tokens being fixed for the life of the process.
+
+        Returns:
+            tuple: (target, calldata) pairs, RBTC balances per address (Multicall3.getEthBalance) first, then balanceOf per coin and address.
+        """
+        calls: List[tuple] = []
+
+        for address in self.address_of_interest:
+            calls.append((MULTICALL_3_ADDRESS, self.multicall_contract.encodeABI(fn_name="getEthBalance", args=[address])))
+
+        for coin, contract in self.contract_by_coin.items():
+            for address in self.address_of_interest:
+                calls.append((contract.address, contract.encodeABI(fn_name="balanceOf", args=[address])))
+
+        return tuple(calls)
+
+    def __query_multi_call(self) -> List[bytes]:
+        """
+        Reads every RBTC and token balance in a single eth_call.
 
-        return balance
+        Returns:
+            List[bytes]: Raw return data, in the order of self.multi_calls.
+        """
+        return self.multicall_contract.functions.aggregate(self.multi_calls).call()[1]
     
     def fetch_positions(self) -> dict:
         balance_by_coin = self.get_token_balances_by_coin()
@@ -134,38 +149,47 @@ class DataFetcher(ExchangeBase):
 
         self.get_prices_for_coins(balance_by_coin)
 
+        # bound once, rather than four dict lookups per coin
+        append_symbol = data_to_return["Symbol"].append
+        append_multiplier = data_to_return["Multiplier"].append
+        append_quantity = data_to_return["Quantity"].append
+        append_dollar_quantity = data_to_return["Dollar Quantity"].append
+        prices_per_coin = self.price_meta_data.prices_per_coin
+
         for coin, balance in balance_by_coin.items():
-            if "USD" in coin:
-                data_to_return["Symbol"].append("USD")
-                data_to_return["Multiplier"].append(1)
-                data_to_return["Quantity"].append(round(balance, 3))
-                data_to_return["Dollar Quantity"].append(round(balance,3 ))
+            quantity = round(balance, 3)
+            append_multiplier(1)
+            append_quantity(quantity)
+            if coin in self.usd_coins:
+                append_symbol("USD")
+                append_dollar_quantity(quantity)
             else:
-                price = self.price_meta_data.prices_per_coin[coin]["usd"]
-                data_to_return["Symbol"].append(coin)
-                data_to_return["Multiplier"].append(1)
-                data_to_return["Quantity"].append(round(balance, 3))
-                data_to_return["Dollar Quantity"].append(round(float(balance) * float(price),3))
+                append_symbol(coin)
+                append_dollar_quantity(round(float(balance) * float(prices_per_coin[coin]["usd"]), 3))
         
         return data_to_return
 
-    def get_prices_for_coins(self, balance_by_coin: Dict[str, float]) -> None:
+    def get_prices_for_coins(self, balance_by_coin: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+        #fetching all but stablecoins usd denominated
+        coins_to_fetch_price_for: List[str] = [coin for coin, _ in balance_by_coin.items() if coin not in self.usd_coins]
+
         if self.price_meta_data:
-            if self.price_meta_data.is_acceptable_timestamp_detla(self.delta_in_seconds_allowed):
+            if self.price_meta_data.is_acceptable_timestamp_delta(self.delta_in_seconds_allowed):
+                # prices are still fresh, only coins that entered the portfolio since are fetched
+                missing_coins: List[str] = [coin for coin in coins_to_fetch_price_for if coin not in self.price_meta_data.prices_per_coin]
+                if missing_coins:
+                    self.price_meta_data.prices_per_coin.update(self.price_fetcher.get_prices(missing_coins))
                 return self.price_meta_data.prices_per_coin
-        
-        #fetching all but stablecoins usd denominated
-        coins_to_fetch_price_for: List[str] = [coin for coin, _ in balance_by_coin.items() if "USD" not in coin]
 
         price_per_coin = self.price_fetcher.get_prices(coins_to_fetch_price_for)
 
-        dt = datetime.utcnow()
-
         self.price_meta_data = priceMetaData(
-            timestamp=dt,
+            timestamp=monotonic(),
             prices_per_coin=price_per_coin
         )
 
+        return price_per_coin
+
 
 if __name__ == '__main__':
     from getpass import getpass
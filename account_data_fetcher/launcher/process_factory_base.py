@@ -1,13 +1,29 @@
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from importlib import import_module
 import inspect
 
+@lru_cache(maxsize=None)
+def _get_init_signature(process_class) -> inspect.Signature:
+    """
+    Returns the (cached) signature of a process class constructor.
+
+    Args:
+        process_class (Class): The process class to introspect.
+
+    Returns:
+        inspect.Signature: Signature of process_class.__init__.
+    """
+    return inspect.signature(process_class.__init__)
+
 class ProcessFactoryBase(ABC):
 
     @classmethod
+    @lru_cache(maxsize=None)
     def get_process_class(cls, process_name: str):
         """
         Retrieves the class object for a given process name.
+        Results are cached per factory and process name, so the module is only resolved once.
 
         Args:
             process_name (str): Name of the process.
@@ -53,7 +69,7 @@ class ProcessFactoryBase(ABC):
         """
         process_instance = cls.get_process_class(process_name)
 
-        signature = inspect.signature(process_instance.__init__)
+        signature = _get_init_signature(process_instance)
         filtered_kwargs = {key: value for key, value in kwargs.items() if key in signature.parameters}
         
         launched_instance = process_instance(*args, **filtered_kwargs)
@@ -89,10 +89,10 @@ class Runner(RunnerBase):
                 #two IB implementations!
                 secret_keys = "ib" if "ib" in process_name.lower() else process_name
                 try:
-                    secrets_json = json.dumps(asdict(self.secrets_per_process[secret_keys]))
+                    secrets = asdict(self.secrets_per_process[secret_keys])
                 except KeyError as e:
                     if str(e) in ["'csv'", "'rsk'"]:
-                        secrets_json = json.dumps({"key": "dummy_key", "secret": "dummy_secret", "other_fields": {}})
+                        secrets = {"key": "dummy_key", "secret": "dummy_secret", "other_fields": {}}
                         self.logger.info(f"KeyError for {e} encountered. Using dummy secrets.")
                     else:
                         raise
@@ -104,7 +104,7 @@ class Runner(RunnerBase):
                     "--kwargs", json.dumps({
                         "port_number": self.port_per_process[process_name],
                         "update_frequency":frequency,
-                        "secrets": secrets_json,
+                        "secrets": secrets,
                         "password": pwd,
                         "data_aggregator_port_number": self.port_per_process["dataaggregator"]
                     })
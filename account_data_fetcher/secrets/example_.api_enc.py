@@ -7,7 +7,7 @@
 'DYDX': 
     {'Secret': 'value', 'Key': 'value', 'Other_fields': {'Passphrase': 'value'}}, 
 'IB': 
-    {'Key': 'value', 'Secret': 'value', 'Other_fields': {'Endpoint': 'FLEX', 'Token': 'value', 'Balance_query_id': 'value', 'Position_query_id': 'value'}}, 
+    {'Key': 'value', 'Secret': 'value', 'Other_fields': {'Endpoint': 'FLEX', 'Token': 'value', 'Balance_query_id': 'value', 'Position_query_id': 'value', 'Combined_query_id': 'optional, overrides the two above'}}, 
 'BYBIT': 
     {'Key': 'value', 'Secret': 'value', 'Other_fields': {}}, 
 'Etherscan': 
@@ -1,6 +1,8 @@
 
 import argparse
-import json
+from functools import lru_cache
+
+import orjson
 
 from account_data_fetcher.launcher.process_factory_base import ProcessFactoryBase
 from infrastructure.api_secret_getter import ApiMetaData
@@ -21,6 +23,7 @@ class ProcessFactory(ProcessFactoryBase):
     __STANDARDIZED_FILE_NAME = "writer" 
 
     @classmethod
+    @lru_cache(maxsize=None)
     def get_module_name(cls, process_name):
         """
         Generates the module name for a given process name.
@@ -51,11 +54,13 @@ class ProcessFactory(ProcessFactoryBase):
         args = parser.parse_args()
 
         # Deserialize the JSON strings
-        args_dict = json.loads(args.args)
-        kwargs_dict = json.loads(args.kwargs)
+        args_dict = orjson.loads(args.args)
+        kwargs_dict = orjson.loads(args.kwargs)
 
-        # Deserialize the secrets JSON string to a dictionary
-        secrets_dict = json.loads(kwargs_dict["secrets"])
+        # Secrets are embedded as an object by the runner, older launchers sent them as a nested JSON string
+        secrets_dict = kwargs_dict["secrets"]
+        if isinstance(secrets_dict, str):
+            secrets_dict = orjson.loads(secrets_dict)
 
         # Convert the dictionary to the SecretsDataClass
         secrets_data_class_instance = ApiMetaData(**secrets_dict)
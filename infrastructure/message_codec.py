@@ -0,0 +1,45 @@
+import msgpack
+import orjson
+
+MSGPACK = b"msgpack"
+JSON = b"json"
+
+def encode_message(msg: dict, wire_format: bytes = MSGPACK) -> bytes:
+    """
+    Serializes a message before it is published on a zmq socket.
+
+    Args:
+        msg (dict): The message to serialize.
+        wire_format (bytes, optional): MSGPACK for compact binary frames, JSON for human-readable debugging. Defaults to MSGPACK.
+
+    Returns:
+        bytes: The serialized message.
+
+    Raises:
+        ValueError: If the wire format is unknown.
+    """
+    if wire_format == MSGPACK:
+        return msgpack.packb(msg, use_bin_type=True)
+    if wire_format == JSON:
+        return orjson.dumps(msg)
+    raise ValueError(f"Unknown wire format {wire_format!r}")
+
+def decode_message(data: bytes, wire_format: bytes = MSGPACK) -> dict:
+    """
+    Deserializes a message received on a zmq socket.
+
+    Args:
+        data (bytes): The serialized message.
+        wire_format (bytes, optional): Format the message was encoded with. Defaults to MSGPACK.
+
+    Returns:
+        dict: The deserialized message.
+
+    Raises:
+        ValueError: If the wire format is unknown.
+    """
+    if wire_format == MSGPACK:
+        return msgpack.unpackb(data, raw=False)
+    if wire_format == JSON:
+        return orjson.loads(data)
+    raise ValueError(f"Unknown wire format {wire_format!r}")
@@ -1,6 +1,7 @@
 import logging
 from typing import Optional, Union
 
+import orjson
 import requests
 
 class RateLimitExceededError(Exception):
@@ -8,8 +9,10 @@ class RateLimitExceededError(Exception):
     pass
 
 class requestHandler:
-    def ___init__(self) -> None:
+    def __init__(self) -> None:
         self.logger = logging.getLogger(__name__)
+        # keep-alive pool, so consecutive calls to the same host skip the TCP and TLS handshakes
+        self.session: requests.Session = requests.Session()
 
     def endpoint_extension(self, url_base: str, url_extension: str = "") -> str:
         return "/".join([url_base, url_extension])
@@ -49,28 +52,28 @@ class requestHandler:
 
         if method == 'get':
             if headers:
-                response = requests.get(
+                response = self.session.get(
                 url=url, params=args, verify=True, headers=headers)
             else:
-                response = requests.get(
+                response = self.session.get(
                 url=url, params=args, verify=True)
 
         elif method == 'post':
             if headers:
-                response = requests.post(
+                response = self.session.post(
                 url=url, data=args, verify=True, headers=headers)
             else:
-                response = requests.post(
+                response = self.session.post(
                     url=url, data=args, verify=True)
 
         elif method == 'put':
 
-            response = requests.put(
+            response = self.session.put(
                 url=url, params=args, verify=True)
 
         elif method == 'delete':
 
-            response = requests.delete(
+            response = self.session.delete(
                 url=url, params=args, verify=True)
 
         else:
@@ -93,6 +96,6 @@ class requestHandler:
             if status_code == 200:
 
                 if response_headers['Content-Type'] in ['application/json', 'charset=utf-8', "application/json; charset=utf-8"]:
-                    return response.json()
+                    return orjson.loads(response.content)
                 else:
                     raise Exception("unhandled response type")